@@ -1,18 +1,50 @@
-"""Flask app that fetches and translates METAR weather reports."""
+"""Quart app that fetches and translates METAR weather reports."""
 
+import asyncio
 import re
-from typing import List, Optional
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-import requests
-from flask import Flask, redirect, render_template, request, url_for
+import httpx
+import orjson
+from jinja2 import FileSystemBytecodeCache
+from quart import Quart, Response, redirect, render_template, request, url_for
 
-app = Flask(__name__)
+app = Quart(__name__)
+# Loaded templates stay in Jinja's in-memory cache without a freshness check
+# on every render (debug mode turns reloading back on), and their compiled
+# bytecode is stored on disk so restarts and other workers skip recompiling.
+app.jinja_env.auto_reload = False
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
 API_URL = "https://aviationweather.gov/api/data/metar"
-ICAO_PATTERN = re.compile(r"^[A-Za-z]{4}$")
-WIND_PATTERN = re.compile(r"^(?P<direction>\d{3}|VRB)(?P<speed>\d{2,3})(G(?P<gust>\d{2,3}))?KT$")
-TEMP_PATTERN = re.compile(r"^(?P<temp>M?\d{2})/(?P<dew>M?\d{2})$")
-ALTIMETER_PATTERN = re.compile(r"^(A|Q)(?P<value>\d{4})$")
+
+# One HTTP/2 client per serving process: every lookup is multiplexed over the
+# same pooled connection to aviationweather.gov instead of opening its own.
+# Created when the app starts serving so it is bound to the server's loop.
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+# Stations publish a new METAR at most every 30-60 minutes, so recently fetched
+# reports are served from memory. Each station has its own lock so concurrent
+# requests for the same code wait for one fetch instead of all hitting the API.
+METAR_CACHE_TTL = 60.0
+_METAR_CACHE: Dict[str, Tuple[float, str]] = {}
+_STATION_LOCKS: Dict[str, asyncio.Lock] = {}
+
+WIND_GROUP = r"(?P<direction>\d{3}|VRB)(?P<speed>\d{2,3})(?:G(?P<gust>\d{2,3}))?KT"
+TEMP_GROUP = r"(?P<temp>M?\d{2})/(?P<dew>M?\d{2})"
+ALTIMETER_GROUP = r"(?P<unit>[AQ])(?P<value>\d{4})"
+# Wind, temperature, and altimeter groups as whole whitespace-delimited tokens,
+# so a single ``finditer`` over the raw report finds all three.
+METAR_GROUP_PATTERN = re.compile(
+    rf"(?<!\S)(?:(?P<wind>{WIND_GROUP})|(?P<temperature>{TEMP_GROUP})|(?P<altimeter>{ALTIMETER_GROUP}))(?!\S)",
+    re.ASCII,
+)
+
+IGNORED_TOKENS = {"NIL", "AUTO", "COR"}
+
+# METAR writes negative temperatures with a leading "M" (e.g. ``M05``).
+TEMPERATURE_SIGN_TABLE = str.maketrans("M", "-")
 
 CLOUD_COVER_MAP = {
     "SKC": "clear sky",
@@ -24,6 +56,10 @@ CLOUD_COVER_MAP = {
     "OVC": "overcast",
 }
 
+# Three-letter coverage prefixes, for a quick reject of non-cloud tokens.
+CLOUD_COVER_CODES = frozenset(code for code in CLOUD_COVER_MAP if len(code) == 3)
+CLEAR_SKY_TOKENS = frozenset({"SKC", "CLR"})
+
 WEATHER_CODES = {
     "RA": "rain",
     "DZ": "drizzle",
@@ -41,6 +77,13 @@ WEATHER_CODES = {
     "DS": "duststorm",
 }
 
+# Human-readable prefixes for weather intensity/proximity modifiers.
+INTENSITY_PREFIXES = {
+    "-": "Light ",
+    "+": "Heavy ",
+    "VC": "In the vicinity: ",
+}
+
 CARDINAL_DIRECTIONS = [
     "north",
     "north-northeast",
@@ -60,166 +103,212 @@ CARDINAL_DIRECTIONS = [
     "north-northwest",
 ]
 
+# Index into CARDINAL_DIRECTIONS for every whole degree, i.e. round(d / 22.5)
+# done in integer arithmetic.
+CARDINAL_INDEX_BY_DEGREE = bytes((degrees * 16 + 180) // 360 % 16 for degrees in range(360))
+
+# "Wind from the ..." phrase for every value a three-digit direction group can
+# hold, so decoding a wind group is a single list index.
+WIND_FROM_PHRASES = [
+    f"Wind from the {CARDINAL_DIRECTIONS[CARDINAL_INDEX_BY_DEGREE[degrees % 360]]} ({degrees}\u00b0)"
+    for degrees in range(1000)
+]
+
+
+class MetarReport(NamedTuple):
+    """A station's raw METAR together with its plain-language translation."""
+
+    icao_code: str
+    raw_metar: str
+    translated: str
+
 
 def validate_icao(code: str) -> bool:
     """Return ``True`` when ``code`` is a valid four-letter ICAO identifier."""
 
-    return bool(ICAO_PATTERN.match(code))
+    return len(code) == 4 and code.isascii() and code.isalpha()
+
+
+async def fetch_metar(icao_code: str) -> str:
+    """Return the raw METAR for ``icao_code``, cached for ``METAR_CACHE_TTL`` seconds."""
+
+    key = icao_code.upper()
+    station_lock = _STATION_LOCKS.get(key)
+    if station_lock is None:
+        station_lock = _STATION_LOCKS[key] = asyncio.Lock()
 
+    async with station_lock:
+        cached = _METAR_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < METAR_CACHE_TTL:
+            return cached[1]
+        report = await _download_metar(key)
+        _METAR_CACHE[key] = (time.monotonic(), report)
+        return report
 
-def fetch_metar(icao_code: str) -> str:
+
+async def _download_metar(icao_code: str) -> str:
     """Fetch the raw METAR string for ``icao_code`` from the Aviation Weather API."""
 
+    if _CLIENT is None:
+        raise RuntimeError("METAR client is not running; start the app before fetching reports.")
+
     params = {"ids": icao_code, "format": "raw"}
     try:
-        response = requests.get(API_URL, params=params, timeout=10)
+        response = await _CLIENT.get(API_URL, params=params)
         response.raise_for_status()
-    except requests.RequestException as exc:
+    except httpx.HTTPError as exc:
         raise RuntimeError(f"Unable to reach METAR service: {exc}") from exc
 
-    reports = [line.strip() for line in response.text.splitlines() if line.strip()]
+    # METAR text is plain ASCII; decoding the bytes directly skips the charset
+    # detection ``response.text`` runs when the server omits an encoding.
+    body = response.content.decode("ascii", "replace")
+    reports = [line.strip() for line in body.splitlines() if line.strip()]
     if not reports:
         raise ValueError("No METAR report found for that station.")
 
     # Return the first report that starts with the ICAO code if available
     for report in reports:
-        if report.upper().startswith(icao_code):
+        if report[:4].upper() == icao_code:
             return report
 
     return reports[0]
 
 
+async def get_report(icao_code: str) -> MetarReport:
+    """Fetch and translate the current METAR for an already validated ``icao_code``."""
+
+    raw_metar = await fetch_metar(icao_code)
+    return MetarReport(icao_code, raw_metar, parse_metar(raw_metar))
+
+
 def parse_metar(raw_metar: str) -> str:
     """Translate a raw METAR string into a human-readable summary."""
 
     if not raw_metar:
         return "Unable to parse METAR report."
 
-    tokens = raw_metar.split()
     phrases: List[str] = []
+    weather_phrases: List[str] = []
+    temp_phrase: Optional[str] = None
+    dew_phrase: Optional[str] = None
+    wind_phrase: Optional[str] = None
+    visibility_phrase: Optional[str] = None
+    pressure_phrase: Optional[str] = None
+
+    # Cloud layers always come before the temperature and altimeter groups, so
+    # the first of those marks where the sky checks can stop.
+    cloud_section_end: Optional[str] = None
+
+    for match in METAR_GROUP_PATTERN.finditer(raw_metar):
+        group = match.lastgroup
+        if group == "wind":
+            if wind_phrase is None:
+                wind_phrase = _decode_wind(match)
+            continue
 
-    sky_phrases = _extract_sky_conditions(tokens)
-    if sky_phrases:
-        phrases.extend(sky_phrases)
-
-    temp_phrase = _extract_temperature(tokens)
-    if temp_phrase:
-        phrases.append(temp_phrase)
-
-    dew_phrase = _extract_dew_point(tokens)
-    if dew_phrase:
-        phrases.append(dew_phrase)
-
-    wind_phrase = _extract_wind(tokens)
-    if wind_phrase:
-        phrases.append(wind_phrase)
+        if cloud_section_end is None:
+            cloud_section_end = match.group()
+        if group == "temperature":
+            if temp_phrase is None:
+                temp_phrase, dew_phrase = _decode_temp_and_dew(match)
+        elif pressure_phrase is None:
+            pressure_phrase = _decode_pressure(match)
+
+    # The remaining groups are classified token by token with cheap prefix and
+    # suffix checks. Tokens that fit no group fall through to the weather
+    # decoder. Sky phrases lead the summary, so they go straight into
+    # ``phrases``.
+    in_cloud_section = True
+    for token in raw_metar.split():
+        if token in IGNORED_TOKENS:
+            continue
 
-    visibility_phrase = _extract_visibility(tokens)
-    if visibility_phrase:
-        phrases.append(visibility_phrase)
+        if in_cloud_section and (token[:3] in CLOUD_COVER_CODES or token == "CAVOK"):
+            sky_phrase = _decode_sky_condition(token)
+            if sky_phrase:
+                phrases.append(sky_phrase)
+                continue
+        elif token.endswith("SM"):
+            if visibility_phrase is None:
+                visibility_phrase = _decode_visibility(token)
+            continue
+        elif token.endswith("KT") or token[-1].isdigit():
+            # Wind, temperature, and altimeter groups were handled by the scan
+            # above, and no weather code ends in a digit or in "KT".
+            if token == cloud_section_end:
+                in_cloud_section = False
+            continue
 
-    pressure_phrase = _extract_pressure(tokens)
-    if pressure_phrase:
-        phrases.append(pressure_phrase)
+        weather = _decode_weather(token)
+        if weather:
+            weather_phrases.append(weather)
 
-    weather_phrase = _extract_weather(tokens)
-    if weather_phrase:
-        phrases.append(weather_phrase)
+    for phrase in (temp_phrase, dew_phrase, wind_phrase, visibility_phrase, pressure_phrase):
+        if phrase:
+            phrases.append(phrase)
+    if weather_phrases:
+        phrases.append("Weather: " + ", ".join(weather_phrases))
 
     return ", ".join(_deduplicate_preserve_order(phrases)) if phrases else "Unable to parse METAR report."
 
 
-def _extract_sky_conditions(tokens: List[str]) -> List[str]:
-    """Return phrases describing cloud coverage and height from tokenized METAR."""
+def _decode_sky_condition(token: str) -> Optional[str]:
+    """Return a phrase describing cloud coverage and height for a sky token."""
 
-    conditions: List[str] = []
-    for token in tokens:
-        if token in {"NIL", "AUTO", "COR"}:
-            continue
-        if token == "CAVOK":
-            conditions.append("Ceiling and visibility OK")
-            continue
+    if token == "CAVOK":
+        return "Ceiling and visibility OK"
+
+    if token in CLEAR_SKY_TOKENS:
+        return "Clear sky"
 
-        coverage_code = token[:3]
-        if coverage_code in CLOUD_COVER_MAP and token[3:6].isdigit():
-            height = int(token[3:6]) * 100
-            description = CLOUD_COVER_MAP[coverage_code]
-            conditions.append(f"{description} at {height} ft")
-        elif token in {"SKC", "CLR"}:
-            if "Clear sky" not in conditions:
-                conditions.append("Clear sky")
-    return conditions
-
-
-def _extract_temperature(tokens: List[str]) -> Optional[str]:
-    """Return a phrase describing the reported temperature, if present."""
-
-    for token in tokens:
-        match = TEMP_PATTERN.match(token)
-        if match:
-            temp = _decode_temperature(match.group("temp"))
-            return f"Temperature {temp}\u00b0C"
+    height = token[3:6]
+    description = CLOUD_COVER_MAP.get(token[:3])
+    if description and height.isdigit():
+        return f"{description} at {int(height) * 100} ft"
     return None
 
 
-def _extract_dew_point(tokens: List[str]) -> Optional[str]:
-    """Return a phrase describing the reported dew point, if present."""
+def _decode_temp_and_dew(match: re.Match[str]) -> Tuple[str, str]:
+    """Return temperature and dew point phrases from one ``TT/DD`` group."""
 
-    for token in tokens:
-        match = TEMP_PATTERN.match(token)
-        if match:
-            dew = _decode_temperature(match.group("dew"))
-            return f"Dew point {dew}\u00b0C"
-    return None
+    temp = _decode_temperature(match.group("temp"))
+    dew = _decode_temperature(match.group("dew"))
+    return f"Temperature {temp}\u00b0C", f"Dew point {dew}\u00b0C"
 
 
 def _decode_temperature(value: str) -> int:
     """Convert METAR temperature strings (e.g. ``M05``) into integers."""
 
-    return -int(value[1:]) if value.startswith("M") else int(value)
+    return int(value.translate(TEMPERATURE_SIGN_TABLE))
 
 
-def _extract_wind(tokens: List[str]) -> Optional[str]:
+def _decode_wind(match: re.Match[str]) -> str:
     """Return a phrase describing wind direction, speed, and gusts."""
 
-    for token in tokens:
-        match = WIND_PATTERN.match(token)
-        if match:
-            direction = match.group("direction")
-            speed = int(match.group("speed"))
-            gust = match.group("gust")
-
-            if speed == 0:
-                return "Calm winds"
+    direction = match.group("direction")
+    speed = int(match.group("speed"))
+    gust = match.group("gust")
 
-            if direction == "VRB":
-                direction_phrase = "Variable winds"
-            else:
-                direction_degrees = int(direction)
-                direction_phrase = f"Wind from the { _degrees_to_cardinal(direction_degrees) } ({direction_degrees}\u00b0)"
-
-            gust_phrase = f", gusting to {int(gust)} kt" if gust else ""
-            return f"{direction_phrase} at {speed} kt{gust_phrase}"
-    return None
+    if speed == 0:
+        return "Calm winds"
 
+    if direction == "VRB":
+        phrase = f"Variable winds at {speed} kt"
+    else:
+        phrase = f"{WIND_FROM_PHRASES[int(direction)]} at {speed} kt"
 
-def _degrees_to_cardinal(degrees: int) -> str:
-    """Convert degrees to the nearest cardinal/intercardinal direction name."""
-
-    index = int((degrees % 360) / 22.5 + 0.5) % len(CARDINAL_DIRECTIONS)
-    return CARDINAL_DIRECTIONS[index]
+    if gust:
+        return f"{phrase}, gusting to {int(gust)} kt"
+    return phrase
 
 
-def _extract_visibility(tokens: List[str]) -> Optional[str]:
+def _decode_visibility(token: str) -> Optional[str]:
     """Return a phrase describing horizontal visibility in statute miles."""
 
-    for token in tokens:
-        if token.endswith("SM"):
-            miles = _convert_visibility_to_float(token)
-            if miles is None:
-                continue
-            return f"Visibility {miles:g} statute miles"
-    return None
+    miles = _convert_visibility_to_float(token)
+    if miles is None:
+        return None
+    return f"Visibility {miles:g} statute miles"
 
 
 def _convert_visibility_to_float(token: str) -> Optional[float]:
@@ -246,75 +335,87 @@ def _fraction_to_float(value: str) -> float:
     return int(numerator) / int(denominator)
 
 
-def _extract_pressure(tokens: List[str]) -> Optional[str]:
+def _decode_pressure(match: re.Match[str]) -> str:
     """Return barometric pressure in hectopascals when reported."""
 
-    for token in tokens:
-        match = ALTIMETER_PATTERN.match(token)
-        if not match:
-            continue
-        prefix = token[0]
-        value = int(match.group("value"))
-        if prefix == "A":
-            inches = value / 100.0
-            hpa = round(inches * 33.8639)
-            return f"Pressure {hpa} hPa"
-        if prefix == "Q":
-            return f"Pressure {value} hPa"
-    return None
-
-
-def _extract_weather(tokens: List[str]) -> Optional[str]:
-    """Return descriptive phrases for significant weather phenomena."""
-
-    phenomena: List[str] = []
-    for token in tokens:
-        for code, description in WEATHER_CODES.items():
-            if token.endswith(code):
-                modifiers = token[:-len(code)]
-                intensity = _decode_intensity(modifiers)
-                phenomena.append(f"{intensity}{description}")
-                break
-    if phenomena:
-        cleaned = [item.replace("  ", " ").strip() for item in phenomena]
-        return "Weather: " + ", ".join(cleaned)
-    return None
+    prefix = match.group("unit")
+    value = int(match.group("value"))
+    if prefix == "A":
+        inches = value / 100.0
+        hpa = round(inches * 33.8639)
+        return f"Pressure {hpa} hPa"
+    return f"Pressure {value} hPa"
 
 
-def _decode_intensity(modifier: str) -> str:
-    """Translate intensity modifiers (e.g. ``-``) into human-readable prefixes."""
+def _decode_weather(token: str) -> Optional[str]:
+    """Return a descriptive phrase for a significant weather token."""
 
-    if modifier == "-":
-        return "Light "
-    if modifier == "+":
-        return "Heavy "
-    if modifier == "VC":
-        return "In the vicinity: "
-    return ""
+    # Every weather code is two letters long, so the suffix identifies it.
+    description = WEATHER_CODES.get(token[-2:])
+    if description is None:
+        return None
+    return f"{INTENSITY_PREFIXES.get(token[:-2], '')}{description}"
 
 
 def _deduplicate_preserve_order(items: List[str]) -> List[str]:
     """Return a list without duplicates while preserving the original order."""
 
-    seen = set()
-    result = []
-    for item in items:
-        key = item.lower()
-        if key not in seen:
-            seen.add(key)
-            result.append(item)
-    return result
+    # Keys keep first-seen order; the parser never emits two phrases that differ
+    # only in case, so which spelling survives does not matter.
+    return list({item.lower(): item for item in items}.values())
+
+
+try:
+    # Compiled build of the parser above, used when it has been built (see README).
+    from parser_c import parse_metar  # noqa: F811
+except ImportError:
+    pass
+
+
+@app.before_serving
+async def _open_client() -> None:
+    """Open the shared HTTP/2 client used by ``fetch_metar``."""
+
+    global _CLIENT
+    _CLIENT = httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        ),
+        headers={"Accept-Encoding": "gzip"},
+        timeout=10,
+    )
+
+
+@app.before_serving
+async def _load_templates() -> None:
+    """Compile the page templates up front so the first requests render immediately."""
+
+    for template_name in ('index.html', 'report.html'):
+        app.jinja_env.get_template(template_name)
+
+
+@app.after_serving
+async def _close_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
 
 
 @app.route('/', methods=['GET', 'POST'])
-def index():
+async def index():
     """Render the search form and redirect to the report page on valid submission."""
 
     error = ""
     icao_code = ""
 
     if request.method == 'POST':
-        icao_code = request.form.get('icao', '').strip().upper()
+        form = await request.form
+        icao_code = form.get('icao', '').strip().upper()
         if not validate_icao(icao_code):
             error = "Please enter a valid 4-letter ICAO code."
         else:
@@ -323,11 +424,11 @@ def index():
         error = request.args.get('error', "")
         icao_code = request.args.get('icao', '').strip().upper()
 
-    return render_template('index.html', error=error, icao_code=icao_code)
+    return await render_template('index.html', error=error, icao_code=icao_code)
 
 
 @app.route('/report/<icao>')
-def report(icao: str):
+async def report(icao: str):
     """Display the raw and translated METAR report on a separate page."""
 
     icao_code = (icao or "").strip().upper()
@@ -335,12 +436,37 @@ def report(icao: str):
         return redirect(url_for('index', error="Please enter a valid 4-letter ICAO code.", icao=icao_code))
 
     try:
-        raw_metar = fetch_metar(icao_code)
-        translated = parse_metar(raw_metar)
+        metar_report = await get_report(icao_code)
     except (RuntimeError, ValueError) as exc:
         return redirect(url_for('index', error=str(exc), icao=icao_code))
 
-    return render_template('report.html', icao_code=icao_code, raw_metar=raw_metar, translated=translated)
+    return await render_template('report.html', **metar_report._asdict())
+
+
+@app.route('/api/metar')
+async def api_metar():
+    """Return the raw and translated METAR for ``?icao=`` as JSON."""
+
+    icao_code = request.args.get('icao', '').strip().upper()
+    if not validate_icao(icao_code):
+        return _json_response({"error": "Please enter a valid 4-letter ICAO code."}, 400)
+
+    try:
+        metar_report = await get_report(icao_code)
+    except RuntimeError as exc:
+        return _json_response({"error": str(exc)}, 502)
+    except ValueError as exc:
+        return _json_response({"error": str(exc)}, 404)
+
+    return _json_response(
+        {"icao": metar_report.icao_code, "raw": metar_report.raw_metar, "translated": metar_report.translated}
+    )
+
+
+def _json_response(payload: Dict[str, str], status: int = 200) -> Response:
+    """Serialize ``payload`` with orjson into a JSON response."""
+
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,278 @@
+# cython: language_level=3
+"""Compiled build of the METAR translator in ``app.py``.
+
+The wind, temperature, and altimeter groups are recognised with character
+checks instead of regular expressions; everything else follows the pure-Python
+parser step for step. ``app.py`` uses this module when it has been built (see
+the README) and falls back to its own ``parse_metar`` otherwise. The lookup
+tables below mirror the ones in ``app.py`` and must be kept in sync with them.
+"""
+
+UNPARSED = "Unable to parse METAR report."
+
+IGNORED_TOKENS = frozenset({"NIL", "AUTO", "COR"})
+
+CLOUD_COVER_MAP = {
+    "SKC": "clear sky",
+    "CLR": "clear sky",
+    "CAVOK": "ceiling and visibility OK",
+    "FEW": "few clouds",
+    "SCT": "scattered clouds",
+    "BKN": "broken clouds",
+    "OVC": "overcast",
+}
+
+CLOUD_COVER_CODES = frozenset(code for code in CLOUD_COVER_MAP if len(code) == 3)
+CLEAR_SKY_TOKENS = frozenset({"SKC", "CLR"})
+
+TEMPERATURE_SIGN_TABLE = str.maketrans("M", "-")
+
+WEATHER_CODES = {
+    "RA": "rain",
+    "DZ": "drizzle",
+    "SN": "snow",
+    "TS": "thunderstorm",
+    "BR": "mist",
+    "FG": "fog",
+    "HZ": "haze",
+    "FU": "smoke",
+    "SG": "snow grains",
+    "PL": "ice pellets",
+    "GR": "hail",
+    "GS": "small hail",
+    "SS": "sandstorm",
+    "DS": "duststorm",
+}
+
+INTENSITY_PREFIXES = {
+    "-": "Light ",
+    "+": "Heavy ",
+    "VC": "In the vicinity: ",
+}
+
+CARDINAL_DIRECTIONS = [
+    "north",
+    "north-northeast",
+    "northeast",
+    "east-northeast",
+    "east",
+    "east-southeast",
+    "southeast",
+    "south-southeast",
+    "south",
+    "south-southwest",
+    "southwest",
+    "west-southwest",
+    "west",
+    "west-northwest",
+    "northwest",
+    "north-northwest",
+]
+
+CARDINAL_INDEX_BY_DEGREE = bytes((degrees * 16 + 180) // 360 % 16 for degrees in range(360))
+
+
+cpdef str parse_metar(str raw_metar):
+    """Translate a raw METAR string into a human-readable summary."""
+
+    cdef list phrases = []
+    cdef list weather_phrases = []
+    cdef bint in_cloud_section = True
+    cdef str token
+    cdef tuple temp_and_dew
+
+    if not raw_metar:
+        return UNPARSED
+
+    temp_phrase = dew_phrase = wind_phrase = visibility_phrase = pressure_phrase = None
+
+    # Single pass: the first temperature or altimeter group closes the cloud
+    # section, exactly where the Python parser's group scan marks its end.
+    for token in raw_metar.split():
+        if token in IGNORED_TOKENS:
+            continue
+
+        if in_cloud_section and (token[:3] in CLOUD_COVER_CODES or token == "CAVOK"):
+            sky_phrase = _decode_sky_condition(token)
+            if sky_phrase is not None:
+                phrases.append(sky_phrase)
+                continue
+        elif token.endswith("SM"):
+            if visibility_phrase is None:
+                visibility_phrase = _decode_visibility(token)
+            continue
+        elif token.endswith("KT"):
+            if wind_phrase is None:
+                wind_phrase = _decode_wind(token)
+            continue
+        elif token[-1].isdigit():
+            temp_and_dew = _decode_temp_and_dew(token)
+            if temp_and_dew is not None:
+                in_cloud_section = False
+                if temp_phrase is None:
+                    temp_phrase, dew_phrase = temp_and_dew
+                continue
+            pressure = _decode_pressure(token)
+            if pressure is not None:
+                in_cloud_section = False
+                if pressure_phrase is None:
+                    pressure_phrase = pressure
+            continue
+
+        weather = _decode_weather(token)
+        if weather is not None:
+            weather_phrases.append(weather)
+
+    for phrase in (temp_phrase, dew_phrase, wind_phrase, visibility_phrase, pressure_phrase):
+        if phrase:
+            phrases.append(phrase)
+    if weather_phrases:
+        phrases.append("Weather: " + ", ".join(weather_phrases))
+
+    if not phrases:
+        return UNPARSED
+    return ", ".join({phrase.lower(): phrase for phrase in phrases}.values())
+
+
+cdef inline bint _is_digit(Py_UCS4 char):
+    return u"0" <= char <= u"9"
+
+
+cdef Py_ssize_t _skip_digits(str token, Py_ssize_t index):
+    """Return the index just past the run of ASCII digits starting at ``index``."""
+
+    cdef Py_ssize_t length = len(token)
+    while index < length and _is_digit(token[index]):
+        index += 1
+    return index
+
+
+cdef object _decode_sky_condition(str token):
+    if token == "CAVOK":
+        return "Ceiling and visibility OK"
+
+    if token in CLEAR_SKY_TOKENS:
+        return "Clear sky"
+
+    height = token[3:6]
+    description = CLOUD_COVER_MAP.get(token[:3])
+    if description and height.isdigit():
+        return f"{description} at {int(height) * 100} ft"
+    return None
+
+
+cdef object _decode_wind(str token):
+    """Decode ``dddff(Ggg)KT`` / ``VRBff(Ggg)KT`` groups; ``None`` if malformed."""
+
+    cdef Py_ssize_t length = len(token)
+    cdef Py_ssize_t speed_end, gust_end
+    cdef int speed, direction_degrees
+
+    if length < 7:
+        return None
+    if token.startswith("VRB"):
+        direction_degrees = -1
+    elif _skip_digits(token, 0) >= 3:
+        direction_degrees = int(token[:3])
+    else:
+        return None
+
+    speed_end = _skip_digits(token, 3)
+    if not 2 <= speed_end - 3 <= 3:
+        return None
+
+    gust = None
+    if speed_end != length - 2:
+        if token[speed_end] != u"G":
+            return None
+        gust_end = _skip_digits(token, speed_end + 1)
+        if gust_end != length - 2 or not 2 <= gust_end - speed_end - 1 <= 3:
+            return None
+        gust = int(token[speed_end + 1:gust_end])
+
+    speed = int(token[3:speed_end])
+    if speed == 0:
+        return "Calm winds"
+
+    if direction_degrees < 0:
+        phrase = f"Variable winds at {speed} kt"
+    else:
+        cardinal = CARDINAL_DIRECTIONS[CARDINAL_INDEX_BY_DEGREE[direction_degrees % 360]]
+        phrase = f"Wind from the {cardinal} ({direction_degrees}\u00b0) at {speed} kt"
+
+    if gust is not None:
+        return f"{phrase}, gusting to {gust} kt"
+    return phrase
+
+
+cdef Py_ssize_t _temperature_end(str token, Py_ssize_t index):
+    """Return the index past an ``M?dd`` field at ``index``, or -1."""
+
+    cdef Py_ssize_t length = len(token)
+    if index < length and token[index] == u"M":
+        index += 1
+    if index + 2 <= length and _is_digit(token[index]) and _is_digit(token[index + 1]):
+        return index + 2
+    return -1
+
+
+cdef object _decode_temp_and_dew(str token):
+    """Decode ``TT/DD`` groups into temperature and dew point phrases."""
+
+    cdef Py_ssize_t slash = _temperature_end(token, 0)
+    if slash < 0 or slash >= len(token) or token[slash] != u"/":
+        return None
+    if _temperature_end(token, slash + 1) != len(token):
+        return None
+
+    temp = int(token[:slash].translate(TEMPERATURE_SIGN_TABLE))
+    dew = int(token[slash + 1:].translate(TEMPERATURE_SIGN_TABLE))
+    return f"Temperature {temp}\u00b0C", f"Dew point {dew}\u00b0C"
+
+
+cdef object _decode_pressure(str token):
+    """Decode ``Annnn`` (inHg) and ``Qnnnn`` (hPa) groups."""
+
+    if len(token) != 5 or _skip_digits(token, 1) != 5:
+        return None
+
+    value = int(token[1:])
+    if token[0] == u"A":
+        return f"Pressure {round(value / 100.0 * 33.8639)} hPa"
+    if token[0] == u"Q":
+        return f"Pressure {value} hPa"
+    return None
+
+
+cdef object _decode_visibility(str token):
+    miles = _convert_visibility_to_float(token)
+    if miles is None:
+        return None
+    return f"Visibility {miles:g} statute miles"
+
+
+cdef object _convert_visibility_to_float(str token):
+    try:
+        value = token[:-2]  # remove 'SM'
+        if value.startswith("P"):
+            value = value[1:]
+        if " " in value:
+            whole, frac = value.split(" ")
+            return float(whole) + _fraction_to_float(frac)
+        if "/" in value:
+            return _fraction_to_float(value)
+        return float(value)
+    except ValueError:
+        return None
+
+
+cdef double _fraction_to_float(str value) except? -1:
+    numerator, denominator = value.split("/")
+    return int(numerator) / int(denominator)
+
+
+cdef object _decode_weather(str token):
+    description = WEATHER_CODES.get(token[-2:])
+    if description is None:
+        return None
+    return f"{INTENSITY_PREFIXES.get(token[:-2], '')}{description}"
@@ -1,8 +1,12 @@
 """Unit tests for METAR parsing helpers in ``app.py``."""
 
+import asyncio
+
+import httpx
 import pytest
 
-from app import parse_metar, validate_icao
+import app as metar_app
+from app import CARDINAL_DIRECTIONS, WIND_FROM_PHRASES, parse_metar, validate_icao
 
 
 @pytest.mark.parametrize(
@@ -72,3 +76,62 @@ def test_validate_icao_input(code: str, expected: bool) -> None:
     """Validate that ICAO codes must be four alphabetic characters."""
 
     assert validate_icao(code) is expected
+
+
+def test_wind_from_phrases_use_nearest_cardinal_direction() -> None:
+    """Each direction should name the nearest 22.5° sector and keep the reported degrees."""
+
+    for degrees in range(1000):
+        cardinal = CARDINAL_DIRECTIONS[int((degrees % 360) / 22.5 + 0.5) % 16]
+        assert WIND_FROM_PHRASES[degrees] == f"Wind from the {cardinal} ({degrees}°)"
+
+
+def test_fetch_metar_serves_repeat_lookups_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A second lookup for the same station within the TTL should not hit the API."""
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["ids"])
+        return httpx.Response(200, content=b"KJFK 051651Z 18015G25KT 10SM FEW025 28/19 A2992\n")
+
+    async def fetch_twice() -> tuple:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(metar_app, "_CLIENT", client)
+            return await metar_app.fetch_metar("KJFK"), await metar_app.fetch_metar("kjfk")
+
+    monkeypatch.setattr(metar_app, "_METAR_CACHE", {})
+    first, second = asyncio.run(fetch_twice())
+
+    assert first == second == "KJFK 051651Z 18015G25KT 10SM FEW025 28/19 A2992"
+    assert calls == ["KJFK"]
+
+
+def test_parse_metar_ignores_cloud_groups_after_temperature() -> None:
+    """Cloud-like tokens in the remarks section should not be reported as sky cover."""
+
+    result = parse_metar("KABC 051651Z 36010KT 3SM SKC 10/09 A3001 RMK FU BKN020")
+
+    assert "Clear sky" in result
+    assert "broken clouds" not in result
+
+
+def test_api_metar_returns_json_report(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The JSON endpoint should return the raw report alongside its translation."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"EGLL 051650Z 27015KT 8000 BKN020 M05/M10 Q1020\n")
+
+    async def get_json() -> tuple:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(metar_app, "_CLIENT", client)
+            response = await metar_app.app.test_client().get("/api/metar", query_string={"icao": "egll"})
+            return response.status_code, await response.get_json()
+
+    monkeypatch.setattr(metar_app, "_METAR_CACHE", {})
+    status, payload = asyncio.run(get_json())
+
+    assert status == 200
+    assert payload["icao"] == "EGLL"
+    assert payload["raw"] == "EGLL 051650Z 27015KT 8000 BKN020 M05/M10 Q1020"
+    assert "Wind from the west (270°) at 15 kt" in payload["translated"]